@@ -0,0 +1,480 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Packs aged Spark event logs into large archive files and removes the originals.
+
+Every event log file is stored as an independent gzip member, so a single
+application can be read back by seeking to its offset. Each archive has a
+sibling .index file with one JSON record per packed file:
+
+  {"app_id": ..., "path": ..., "offset": ..., "length": ..., "size": ..., "mtime": ..., "codec": ...}
+
+Log and archive directories may be local paths (or file:// URIs) or any URI
+understood by "hdfs dfs". A file is only deleted once it has been read back in
+full and its whole archive and index are published.
+
+"hdfs dfs" cannot read from an offset, so extracting from an HDFS archive reads
+it through WebHDFS (op=OPEN with offset and length, via curl --negotiate) when
+--webhdfs-url is given, one per NameNode for HA. Without it the archive is
+streamed from its start and everything before the member is discarded, which
+transfers up to the whole archive for the last application in it.
+
+This script has no Ambari dependencies, so it can also be run by hand:
+
+  event_log_archiver.py archive --log-dir hdfs:///spark3-history --archive-dir hdfs:///spark3-history-archive --max-age-days 14
+  event_log_archiver.py list --archive-dir hdfs:///spark3-history-archive
+  event_log_archiver.py extract --archive-dir hdfs:///spark3-history-archive --app-id application_1_0001 --output-dir hdfs:///spark3-history \
+    --webhdfs-url http://namenode:50070
+"""
+
+import argparse
+import getpass
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+import zlib
+
+try:
+  from urlparse import urlparse
+except ImportError:
+  from urllib.parse import urlparse
+
+ARCHIVE_SUFFIX = ".archive"
+INDEX_SUFFIX = ".index"
+TMP_SUFFIX = ".tmp"
+INPROGRESS_SUFFIX = ".inprogress"
+ROLLING_EVENT_LOG_PREFIX = "eventlog_v2_"
+
+# event logs written with spark.eventLog.compress are stored as they are
+COMPRESSED_CODEC_SUFFIXES = (".lz4", ".lzf", ".snappy", ".zstd")
+CODEC_GZIP = "gzip"
+CODEC_NONE = "none"
+
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+class FileStatus(object):
+  def __init__(self, name, is_dir, size, mtime):
+    self.name = name
+    self.is_dir = is_dir
+    self.size = size
+    self.mtime = mtime
+
+
+class LocalFileSystem(object):
+
+  def list(self, path):
+    statuses = []
+    for name in sorted(os.listdir(path)):
+      stat = os.stat(os.path.join(path, name))
+      statuses.append(FileStatus(name, os.path.isdir(os.path.join(path, name)), stat.st_size, int(stat.st_mtime)))
+    return statuses
+
+  def exists(self, path):
+    return os.path.exists(path)
+
+  def mkdirs(self, path):
+    if not os.path.isdir(path):
+      os.makedirs(path)
+
+  def open(self, path):
+    return open(path, "rb")
+
+  def read_range(self, path, offset, length):
+    with open(path, "rb") as f:
+      f.seek(offset)
+      return f.read(length)
+
+  def create(self, path):
+    return open(path, "wb")
+
+  def rename(self, src, dst):
+    os.rename(src, dst)
+
+  def delete(self, path):
+    if os.path.isdir(path):
+      shutil.rmtree(path)
+    else:
+      os.remove(path)
+
+
+class HadoopOutputStream(object):
+  """
+  Streams written bytes into "hdfs dfs -put"; close() fails if the put did.
+  """
+  def __init__(self, path):
+    self.path = path
+    self.process = subprocess.Popen(["hdfs", "dfs", "-put", "-f", "-", path], stdin=subprocess.PIPE)
+
+  def write(self, data):
+    self.process.stdin.write(data)
+
+  def close(self):
+    self.process.stdin.close()
+    if self.process.wait() != 0:
+      raise IOError("Failed to write {0}".format(self.path))
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *args):
+    self.close()
+
+
+class HadoopInputStream(object):
+  """
+  Reads the output of "hdfs dfs -cat"; close() fails if the cat did.
+  """
+  def __init__(self, path):
+    self.path = path
+    self.process = subprocess.Popen(["hdfs", "dfs", "-cat", path], stdout=subprocess.PIPE)
+
+  def read(self, size=-1):
+    return self.process.stdout.read(size)
+
+  def close(self):
+    self.process.stdout.close()
+    if self.process.wait() != 0:
+      raise IOError("Failed to read {0}".format(self.path))
+
+
+class HadoopFileSystem(object):
+
+  def __init__(self, webhdfs_urls=None):
+    self.webhdfs_urls = webhdfs_urls or []
+
+  def _run(self, *args):
+    return subprocess.check_output(("hdfs", "dfs") + args)
+
+  def list(self, path):
+    statuses = []
+    for line in self._run("-ls", path).decode("utf-8").splitlines():
+      # drwxrwx---   - spark hadoop          0 2020-01-01 10:00 hdfs:///spark3-history/eventlog_v2_...
+      parts = line.split(None, 7)
+      if len(parts) != 8:
+        continue
+      mtime = int(time.mktime(time.strptime(parts[5] + " " + parts[6], "%Y-%m-%d %H:%M")))
+      statuses.append(FileStatus(parts[7].rstrip("/").rsplit("/", 1)[-1], parts[0].startswith("d"), int(parts[4]), mtime))
+    return sorted(statuses, key=lambda status: status.name)
+
+  def exists(self, path):
+    return subprocess.call(["hdfs", "dfs", "-test", "-e", path]) == 0
+
+  def mkdirs(self, path):
+    self._run("-mkdir", "-p", path)
+
+  def open(self, path):
+    return HadoopInputStream(path)
+
+  def read_range(self, path, offset, length):
+    for webhdfs_url in self.webhdfs_urls:
+      # the standby namenode refuses the read, so just move on to the next one
+      url = "{0}/webhdfs/v1{1}?op=OPEN&offset={2}&length={3}&user.name={4}".format(
+        webhdfs_url.rstrip("/"), urlparse(path).path, offset, length, getpass.getuser())
+      process = subprocess.Popen(["curl", "-sS", "-f", "-L", "--negotiate", "-u", ":", url], stdout=subprocess.PIPE)
+      data = process.communicate()[0]
+      if process.returncode == 0 and len(data) == length:
+        return data
+
+    source = self.open(path)
+    try:
+      while offset > 0:
+        skipped = len(source.read(min(offset, COPY_BUFFER_SIZE)))
+        if not skipped:
+          raise IOError("Unexpected end of {0}".format(path))
+        offset -= skipped
+      data = source.read(length)
+    finally:
+      source.process.stdout.close()
+      source.process.wait()
+    return data
+
+  def create(self, path):
+    return HadoopOutputStream(path)
+
+  def rename(self, src, dst):
+    self._run("-mv", src, dst)
+
+  def delete(self, path):
+    self._run("-rm", "-r", "-skipTrash", path)
+
+
+def get_filesystem(path, webhdfs_urls=None):
+  """
+  Returns the filesystem for path and path in the form that filesystem expects.
+  """
+  url = urlparse(path)
+  if url.scheme in ("", "file"):
+    return LocalFileSystem(), url.path
+  return HadoopFileSystem(webhdfs_urls), path
+
+
+def join_path(parent, name):
+  return parent.rstrip("/") + "/" + name
+
+
+def strip_codec_suffix(name):
+  for suffix in COMPRESSED_CODEC_SUFFIXES:
+    if name.endswith(suffix):
+      return name[:-len(suffix)]
+  return name
+
+
+def find_aged_applications(fs, log_dir, max_age_days, now=None):
+  """
+  Returns [(app_id, entry name, [(relative path, FileStatus), ...])] for every
+  completed application in log_dir whose event logs were last modified more than
+  max_age_days ago. Rolling event log directories (eventlog_v2_*) count as
+  a single application.
+  """
+  cutoff = (now if now is not None else time.time()) - max_age_days * 24 * 3600
+  applications = []
+  for status in fs.list(log_dir):
+    if status.name.endswith(INPROGRESS_SUFFIX):
+      continue
+    if status.is_dir:
+      if not status.name.startswith(ROLLING_EVENT_LOG_PREFIX):
+        continue
+      files = [(join_path(status.name, child.name), child) for child in fs.list(join_path(log_dir, status.name)) if not child.is_dir]
+      if not files or any(child.name.endswith(INPROGRESS_SUFFIX) for _, child in files):
+        continue
+      app_id = status.name[len(ROLLING_EVENT_LOG_PREFIX):]
+    else:
+      files = [(status.name, status)]
+      app_id = strip_codec_suffix(status.name)
+    if max(child.mtime for _, child in files) < cutoff:
+      applications.append((app_id, status.name, files))
+  return applications
+
+
+def get_codec(path):
+  if path.endswith(COMPRESSED_CODEC_SUFFIXES):
+    return CODEC_NONE
+  return CODEC_GZIP
+
+
+def pack_file(fs, path, status, codec, out):
+  """
+  Appends the file at path to out as one member and returns the bytes written.
+  Fails unless exactly status.size bytes could be read, so a file is never
+  deleted after a short or failed read.
+  """
+  compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, GZIP_WBITS) if codec == CODEC_GZIP else None
+  read = 0
+  written = 0
+  source = fs.open(path)
+  try:
+    while True:
+      data = source.read(COPY_BUFFER_SIZE)
+      if not data:
+        break
+      read += len(data)
+      if compressor:
+        data = compressor.compress(data)
+      out.write(data)
+      written += len(data)
+  finally:
+    source.close()
+  if read != status.size:
+    raise IOError("Read {0} bytes of {1}, expected {2}".format(read, path, status.size))
+  if compressor:
+    data = compressor.flush()
+    out.write(data)
+    written += len(data)
+  return written
+
+
+def unpack_member(data, codec):
+  if codec == CODEC_GZIP:
+    return zlib.decompress(data, GZIP_WBITS)
+  return data
+
+
+def write_archive(log_fs, log_dir, archive_fs, archive_dir, archive_name, applications):
+  """
+  Packs applications into archive_name and publishes it together with its
+  index. The archive only becomes visible once both files are complete.
+  """
+  archive_path = join_path(archive_dir, archive_name + ARCHIVE_SUFFIX)
+  index_path = join_path(archive_dir, archive_name + INDEX_SUFFIX)
+
+  entries = []
+  offset = 0
+  try:
+    with archive_fs.create(archive_path + TMP_SUFFIX) as out:
+      for app_id, _, files in applications:
+        for relative_path, status in files:
+          codec = get_codec(relative_path)
+          length = pack_file(log_fs, join_path(log_dir, relative_path), status, codec, out)
+          entries.append({
+            "app_id": app_id,
+            "path": relative_path,
+            "offset": offset,
+            "length": length,
+            "size": status.size,
+            "mtime": status.mtime,
+            "codec": codec,
+          })
+          offset += length
+
+    with archive_fs.create(index_path + TMP_SUFFIX) as out:
+      for entry in entries:
+        out.write((json.dumps(entry, sort_keys=True) + "\n").encode("utf-8"))
+  except Exception:
+    for tmp_path in (archive_path + TMP_SUFFIX, index_path + TMP_SUFFIX):
+      if archive_fs.exists(tmp_path):
+        archive_fs.delete(tmp_path)
+    raise
+
+  archive_fs.rename(archive_path + TMP_SUFFIX, archive_path)
+  archive_fs.rename(index_path + TMP_SUFFIX, index_path)
+  return archive_path, entries
+
+
+def archive(log_dir, archive_dir, max_age_days, archive_size_mb, now=None):
+  """
+  Packs every application older than max_age_days into archives of roughly
+  archive_size_mb each and deletes the originals of each archive once it is
+  published. Returns the number of applications archived.
+  """
+  log_fs, log_dir = get_filesystem(log_dir)
+  archive_fs, archive_dir = get_filesystem(archive_dir)
+  archive_fs.mkdirs(archive_dir)
+
+  applications = find_aged_applications(log_fs, log_dir, max_age_days, now=now)
+  archive_size = archive_size_mb * 1024 * 1024
+  archive_prefix = "eventlogs-" + time.strftime("%Y%m%d%H%M%S", time.gmtime(now))
+
+  batches = []
+  batch, batch_size = [], 0
+  for app_id, entry_name, files in applications:
+    batch.append((app_id, entry_name, files))
+    # sizes are uncompressed, so archives usually end up smaller than archive_size_mb
+    batch_size += sum(status.size for _, status in files)
+    if batch_size >= archive_size:
+      batches.append(batch)
+      batch, batch_size = [], 0
+  if batch:
+    batches.append(batch)
+
+  for sequence, batch in enumerate(batches):
+    archive_path, entries = write_archive(log_fs, log_dir, archive_fs, archive_dir,
+                                          "{0}-{1:04d}".format(archive_prefix, sequence), batch)
+    for _, entry_name, _ in batch:
+      log_fs.delete(join_path(log_dir, entry_name))
+    print("Archived {0} applications ({1} files) into {2}".format(len(batch), len(entries), archive_path))
+
+  return len(applications)
+
+
+def read_index(archive_dir, app_id=None):
+  """
+  Returns [(archive path, entry)] for all indexed files, optionally only those
+  of app_id. Later archives come last, so their entries win on extraction.
+  """
+  archive_fs, archive_dir = get_filesystem(archive_dir)
+  if not archive_fs.exists(archive_dir):
+    return []
+  records = []
+  for status in archive_fs.list(archive_dir):
+    if status.is_dir or not status.name.endswith(INDEX_SUFFIX):
+      continue
+    archive_path = join_path(archive_dir, status.name[:-len(INDEX_SUFFIX)] + ARCHIVE_SUFFIX)
+    index = archive_fs.open(join_path(archive_dir, status.name))
+    try:
+      for line in index.read().decode("utf-8").splitlines():
+        entry = json.loads(line)
+        if app_id is None or entry["app_id"] == app_id:
+          records.append((archive_path, entry))
+    finally:
+      index.close()
+  return records
+
+
+def extract(archive_dir, app_id, output_dir, webhdfs_urls=None):
+  """
+  Restores the event logs of app_id into output_dir, e.g. the History Server
+  log directory. Returns the restored paths.
+  """
+  archive_fs, _ = get_filesystem(archive_dir, webhdfs_urls)
+  output_fs, output_dir = get_filesystem(output_dir)
+
+  latest = {}
+  for archive_path, entry in read_index(archive_dir, app_id):
+    latest[entry["path"]] = (archive_path, entry)
+  if not latest:
+    raise KeyError("Application {0} not found in {1}".format(app_id, archive_dir))
+
+  output_fs.mkdirs(output_dir)
+  restored = []
+  for relative_path in sorted(latest):
+    archive_path, entry = latest[relative_path]
+    data = unpack_member(archive_fs.read_range(archive_path, entry["offset"], entry["length"]), entry["codec"])
+    output_path = join_path(output_dir, relative_path)
+    if "/" in relative_path:
+      output_fs.mkdirs(join_path(output_dir, relative_path.rsplit("/", 1)[0]))
+    with output_fs.create(output_path) as out:
+      out.write(data)
+    restored.append(output_path)
+  return restored
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Archive aged Spark event logs into indexed archives.")
+  subparsers = parser.add_subparsers(dest="command")
+
+  archive_parser = subparsers.add_parser("archive", help="pack aged event logs and remove the originals")
+  archive_parser.add_argument("--log-dir", required=True)
+  archive_parser.add_argument("--archive-dir", required=True)
+  archive_parser.add_argument("--max-age-days", type=int, required=True)
+  archive_parser.add_argument("--archive-size-mb", type=int, default=1024)
+
+  list_parser = subparsers.add_parser("list", help="list archived applications")
+  list_parser.add_argument("--archive-dir", required=True)
+  list_parser.add_argument("--app-id")
+
+  extract_parser = subparsers.add_parser("extract", help="restore the event logs of one application")
+  extract_parser.add_argument("--archive-dir", required=True)
+  extract_parser.add_argument("--app-id", required=True)
+  extract_parser.add_argument("--output-dir", required=True)
+  extract_parser.add_argument("--webhdfs-url", action="append",
+                              help="NameNode http address for positioned reads, e.g. http://namenode:50070")
+
+  args = parser.parse_args(argv)
+
+  if args.command == "archive":
+    count = archive(args.log_dir, args.archive_dir, args.max_age_days, args.archive_size_mb)
+    print("Archived {0} applications older than {1} days".format(count, args.max_age_days))
+  elif args.command == "list":
+    for archive_path, entry in read_index(args.archive_dir, args.app_id):
+      print("{0}\t{1}\t{2}\t{3}\t{4}".format(entry["app_id"], entry["path"], archive_path, entry["offset"], entry["length"]))
+  elif args.command == "extract":
+    for path in extract(args.archive_dir, args.app_id, args.output_dir, args.webhdfs_url):
+      print("Restored {0}".format(path))
+  else:
+    parser.print_help()
+    return 1
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Caching reverse proxy in front of one or more Spark History Servers.
+
+Pages and REST calls of a single application (/history/<app-id>/... and
+/api/v1/applications/<app-id>/...) are always routed to the same instance,
+picked by hashing the application id, so every application is replayed by
+one History Server only. Everything else, including the application listing,
+goes to the local instance first. Other instances are tried in turn when the
+chosen one is unreachable or fails with a 5xx.
+
+Successful GET responses are kept for --cache-ttl seconds, so dashboards
+polling the REST API do not reach the History Servers on every request.
+"""
+
+import argparse
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+try:
+  from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+  from SocketServer import ThreadingMixIn
+  from httplib import HTTPConnection, HTTPException
+  from urlparse import urlparse
+except ImportError:
+  from http.server import BaseHTTPRequestHandler, HTTPServer
+  from socketserver import ThreadingMixIn
+  from http.client import HTTPConnection, HTTPException
+  from urllib.parse import urlparse
+
+APPLICATION_PATH_PATTERN = re.compile(r"^/(?:history|api/v1/applications)/(?P<app_id>[^/?]+)")
+
+# hop-by-hop headers are never forwarded, see RFC 2616 section 13.5.1
+HOP_BY_HOP_HEADERS = frozenset([
+  "connection", "keep-alive", "proxy-authenticate", "proxy-authorization",
+  "te", "trailers", "transfer-encoding", "upgrade", "content-length",
+])
+
+# send_response adds the proxy's own, and a cached backend Date would be stale
+REPLACED_RESPONSE_HEADERS = frozenset(["server", "date"])
+
+BACKEND_TIMEOUT = 120
+
+# responses are cached by path only, so never let the History Server pick an
+# encoding the next client may not accept
+FORWARDED_ACCEPT_ENCODING = "identity"
+
+
+class ResponseCache(object):
+  """
+  Thread safe TTL cache holding at most max_entries responses.
+  """
+  def __init__(self, ttl, max_entries):
+    self.ttl = ttl
+    self.max_entries = max_entries
+    self.entries = OrderedDict()
+    self.lock = threading.Lock()
+
+  def get(self, key):
+    with self.lock:
+      entry = self.entries.get(key)
+      if entry is None:
+        return None
+      if entry[0] < time.time():
+        del self.entries[key]
+        return None
+      return entry[1]
+
+  def put(self, key, response):
+    if self.ttl <= 0:
+      return
+    with self.lock:
+      self.entries.pop(key, None)
+      self.entries[key] = (time.time() + self.ttl, response)
+      while len(self.entries) > self.max_entries:
+        self.entries.popitem(last=False)
+
+
+def get_forwarded_headers(headers, dropped=()):
+  """
+  Returns the (name, value) pairs of headers that may be forwarded, leaving out
+  hop-by-hop headers, the headers listed in Connection (RFC 7230 section 6.1)
+  and dropped.
+  """
+  connection_headers = set()
+  for key, value in headers:
+    if key.lower() == "connection":
+      connection_headers.update(token.strip().lower() for token in value.split(","))
+  return [(key, value) for key, value in headers
+          if key.lower() not in HOP_BY_HOP_HEADERS and key.lower() not in connection_headers and key.lower() not in dropped]
+
+
+def get_backends(path, backends, local_backend):
+  """
+  Returns the backends to try for path, most preferred first.
+  """
+  match = APPLICATION_PATH_PATTERN.match(path)
+  if match:
+    first = backends[(zlib.crc32(match.group("app_id").encode("utf-8")) & 0xffffffff) % len(backends)]
+  elif local_backend in backends:
+    first = local_backend
+  else:
+    first = backends[0]
+  return [first] + [backend for backend in backends if backend != first]
+
+
+class HistoryServerProxyHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+
+  def do_GET(self):
+    cache = self.server.cache
+    cached = cache.get(self.path)
+    if cached is None:
+      response = self.forward()
+      if response is None:
+        return
+      if response[0] == 200 and not any(key.lower() == "content-encoding" for key, _ in response[1]):
+        cache.put(self.path, response)
+    else:
+      response = cached
+    self.reply(*response)
+
+  def do_HEAD(self):
+    response = self.forward()
+    if response is not None:
+      self.reply(response[0], response[1], b"", content_length=len(response[2]))
+
+  def forward(self):
+    """
+    Returns (status, headers, body) from the first backend that answers
+    without a 5xx, or sends a 502 and returns None.
+    """
+    headers = dict(get_forwarded_headers(self.headers.items(), dropped=("accept-encoding",)))
+    headers["Accept-Encoding"] = FORWARDED_ACCEPT_ENCODING
+    last_error = None
+    for backend in get_backends(self.path, self.server.backends, self.server.local_backend):
+      url = urlparse(backend)
+      connection = HTTPConnection(url.hostname, url.port, timeout=BACKEND_TIMEOUT)
+      try:
+        connection.request("GET", self.path, headers=headers)
+        response = connection.getresponse()
+        body = response.read()
+        if response.status >= 500:
+          last_error = "{0} returned {1}".format(backend, response.status)
+          continue
+        response_headers = [(key, self.rewrite_location(key, value, backend)) for key, value
+                            in get_forwarded_headers(response.getheaders(), dropped=REPLACED_RESPONSE_HEADERS)]
+        return response.status, response_headers, body
+      except (HTTPException, IOError) as e:
+        last_error = "{0} failed: {1}".format(backend, e)
+      finally:
+        connection.close()
+    self.log_error("No History Server answered %s: %s", self.path, last_error)
+    self.reply(502, [("Content-Type", "text/plain")], b"No Spark History Server available\n")
+    return None
+
+  def rewrite_location(self, key, value, backend):
+    # keep redirects on the proxy instead of sending clients to one instance
+    if key.lower() == "location" and value.startswith(backend):
+      return value[len(backend):] or "/"
+    return value
+
+  def reply(self, status, headers, body, content_length=None):
+    self.send_response(status)
+    for key, value in headers:
+      self.send_header(key, value)
+    self.send_header("Content-Length", str(len(body) if content_length is None else content_length))
+    self.end_headers()
+    if body:
+      self.wfile.write(body)
+
+
+class HistoryServerProxy(ThreadingMixIn, HTTPServer):
+  daemon_threads = True
+
+  def __init__(self, address, backends, local_backend, cache):
+    HTTPServer.__init__(self, address, HistoryServerProxyHandler)
+    self.backends = backends
+    self.local_backend = local_backend
+    self.cache = cache
+
+
+def main(argv=None):
+  parser = argparse.ArgumentParser(description="Caching reverse proxy for Spark History Servers.")
+  parser.add_argument("--port", type=int, required=True)
+  parser.add_argument("--backend", action="append", required=True,
+                      help="History Server url, e.g. http://host:18082. Every proxy must be given the same list.")
+  parser.add_argument("--local-backend", help="History Server url preferred for non application requests")
+  parser.add_argument("--cache-ttl", type=int, default=60)
+  parser.add_argument("--cache-max-entries", type=int, default=10000)
+  args = parser.parse_args(argv)
+
+  backends = [backend.rstrip("/") for backend in args.backend]
+  local_backend = args.local_backend.rstrip("/") if args.local_backend else None
+  server = HistoryServerProxy(("", args.port), backends, local_backend,
+                              ResponseCache(args.cache_ttl, args.cache_max_entries))
+  server.serve_forever()
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main())
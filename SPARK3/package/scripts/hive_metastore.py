@@ -0,0 +1,180 @@
+#!/usr/bin/python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import os
+import re
+
+from resource_management.core.exceptions import Fail
+from resource_management.core.logger import Logger
+from resource_management.core.resources.system import Directory, Execute, File, Link
+from resource_management.libraries.functions.format import format
+
+# hive-exec-3.1.0.3.1.0.0-78.jar -> hive-exec, 3.1.0.3.1.0.0-78
+JAR_ARTIFACT_PATTERN = re.compile(r"^(?P<artifact>.+)-(?P<version>\d+\.[\w.\-]*)\.jar$")
+VERSION_SEPARATOR_PATTERN = re.compile(r"[.\-]")
+# hbase-server-2.0.2.3.1.0.0-78-tests.jar is a different artifact than hbase-server-2.0.2.3.1.0.0-78.jar
+CLASSIFIER_PATTERN = re.compile(r"-(?P<classifier>tests|test-sources|sources|javadoc|standalone|shaded|classes|nohive|"
+                                r"jar-with-dependencies)$")
+
+# values of spark.sql.hive.metastore.jars shipped by this and earlier versions
+# of the stack, anything else was set by the operator and is left alone
+STACK_DEFAULT_METASTORE_JARS = ('maven', '/usr/hdp/current/spark3-client/standalone-metastore/*')
+
+METASTORE_JARS_MANIFEST = "metastore-jars.txt"
+METASTORE_JARS_VALIDATED = ".validated"
+
+
+def jar_artifact(jar_name):
+  """
+  Returns (artifact, version key) of jar_name. A trailing classifier such as
+  -tests or -standalone belongs to the artifact, not to the version. The key
+  compares numeric parts as numbers, so 2.10.0 sorts above 2.9.10.
+  """
+  match = JAR_ARTIFACT_PATTERN.match(jar_name)
+  if not match:
+    return jar_name[:-len(".jar")], ()
+  artifact, version = match.group('artifact'), match.group('version')
+  classifier = CLASSIFIER_PATTERN.search(version)
+  if classifier:
+    artifact += classifier.group(0)
+    version = version[:classifier.start()]
+  version_key = tuple((int(part), '') if part.isdigit() else (-1, part)
+                      for part in VERSION_SEPARATOR_PATTERN.split(version))
+  return artifact, version_key
+
+
+def resolve_metastore_jars(lib_dir):
+  """
+  Returns the jars of lib_dir as a sorted list of real paths, keeping a single
+  jar per artifact and classifier. Symlinks (hive-exec.jar -> hive-exec-<version>.jar) are
+  collapsed onto their target and, if several versions of one artifact are
+  present, the highest version wins.
+  """
+  jars = {}
+  for jar_name in sorted(os.listdir(lib_dir)):
+    if not jar_name.endswith(".jar"):
+      continue
+    jar_path = os.path.realpath(os.path.join(lib_dir, jar_name))
+    if not os.path.isfile(jar_path):
+      continue
+    artifact, version_key = jar_artifact(os.path.basename(jar_path))
+    if artifact not in jars or version_key > jars[artifact][0]:
+      jars[artifact] = (version_key, jar_path)
+  return sorted(jar_path for _, jar_path in jars.values())
+
+
+def setup_hive_metastore_jars():
+  """
+  Builds the versioned Hive metastore client jar set under
+  spark_hive_metastore_jars_dir from the local Hive client and validates it
+  against a throw-away Derby metastore. Returns the jar paths to use for
+  spark.sql.hive.metastore.jars.path, or None if there is no Hive client on
+  this host or the jar set does not work, in which case the configured
+  spark.sql.hive.metastore.jars is kept.
+  """
+  import params
+
+  if not os.path.isdir(params.hive_lib_dir):
+    Logger.warning(format("Hive client libraries not found at {hive_lib_dir}, keeping configured spark.sql.hive.metastore.jars"))
+    return None
+
+  Directory(params.spark_hive_metastore_jars_dir,
+            owner=params.spark_user,
+            group=params.user_group,
+            create_parents = True,
+            mode=0755
+  )
+
+  metastore_jars = []
+  for jar_path in resolve_metastore_jars(params.hive_lib_dir):
+    link_path = os.path.join(params.spark_hive_metastore_jars_dir, os.path.basename(jar_path))
+    Link(link_path, to=jar_path)
+    metastore_jars.append(link_path)
+
+  if not metastore_jars:
+    Logger.warning(format("No jars found in {hive_lib_dir}, keeping configured spark.sql.hive.metastore.jars"))
+    return None
+
+  manifest = os.path.join(params.spark_hive_metastore_jars_dir, METASTORE_JARS_MANIFEST)
+  validated = os.path.join(params.spark_hive_metastore_jars_dir, METASTORE_JARS_VALIDATED)
+  File(manifest,
+       owner=params.spark_user,
+       group=params.user_group,
+       content="\n".join(metastore_jars) + "\n",
+       mode=0644
+  )
+
+  try:
+    validate_hive_metastore_jars(metastore_jars, manifest, validated)
+  except Fail as e:
+    Logger.warning(format("Hive metastore jars in {spark_hive_metastore_jars_dir} failed validation, "
+                          "keeping configured spark.sql.hive.metastore.jars: {e}"))
+    return None
+  return metastore_jars
+
+
+def validate_hive_metastore_jars(metastore_jars, manifest, validated):
+  """
+  Starts a local spark-sql session backed by an embedded Derby metastore and
+  the given jar set. It only runs when the manifest differs from the last one
+  validated, so unchanged hosts pay nothing on configure. The session gets
+  empty Spark and Hadoop conf dirs and a local default filesystem, so it never
+  needs HDFS or a Kerberos ticket.
+  """
+  import params
+
+  validate_dir = os.path.join(params.spark_hive_metastore_jars_dir, "validate")
+  Directory(validate_dir,
+            owner=params.spark_user,
+            group=params.user_group,
+            create_parents = True,
+            mode=0755
+  )
+
+  validate_confs = {
+    'spark.master': 'local[1]',
+    'spark.eventLog.enabled': 'false',
+    'spark.ui.enabled': 'false',
+    'spark.sql.catalogImplementation': 'hive',
+    'spark.sql.hive.metastore.version': params.spark_hive_metastore_version,
+    'spark.sql.hive.metastore.jars': 'path',
+    'spark.sql.hive.metastore.jars.path': ",".join("file://" + jar for jar in metastore_jars),
+    'spark.sql.warehouse.dir': format("file://{validate_dir}/warehouse"),
+    'spark.hadoop.fs.defaultFS': 'file:///',
+    'spark.hadoop.hive.exec.scratchdir': format("{validate_dir}/scratch"),
+    'spark.hadoop.hive.exec.local.scratchdir': format("{validate_dir}/scratch"),
+    'spark.hadoop.hive.metastore.uris': '',
+    'spark.hadoop.javax.jdo.option.ConnectionURL': format("jdbc:derby:;databaseName={validate_dir}/metastore_db;create=true"),
+    'spark.hadoop.javax.jdo.option.ConnectionDriverName': 'org.apache.derby.jdbc.EmbeddedDriver',
+    'spark.hadoop.hive.metastore.schema.verification': 'false',
+    'spark.hadoop.datanucleus.schema.autoCreateAll': 'true',
+  }
+  conf_args = " ".join("--conf '{0}={1}'".format(key, value) for key, value in sorted(validate_confs.items()))
+
+  Execute(format("rm -rf {validate_dir}/metastore_db {validate_dir}/warehouse {validate_dir}/scratch && "
+                 "{spark_home}/bin/spark-sql {conf_args} -e 'SHOW DATABASES' && cp -f {manifest} {validated}"),
+          user=params.spark_user,
+          cwd=validate_dir,
+          environment={'JAVA_HOME': params.java_home,
+                       'SPARK_CONF_DIR': validate_dir,
+                       'HADOOP_CONF_DIR': validate_dir},
+          not_if=format("cmp -s {manifest} {validated}"),
+          logoutput=True
+  )
@@ -22,6 +22,8 @@ import sys
 import os
 
 from resource_management.libraries.script.script import Script
+from resource_management.core.resources.system import Execute
+from resource_management.libraries.functions.format import format
 from resource_management.libraries.functions import stack_select
 from resource_management.libraries.functions.copy_tarball import copy_to_hdfs
 from resource_management.libraries.functions.check_process_status import check_process_status
@@ -30,7 +32,7 @@ from resource_management.libraries.functions.constants import StackFeature
 from resource_management.core.logger import Logger
 from resource_management.core import shell
 from setup_spark import setup_spark
-from spark_service import spark_service
+from spark_service import spark_service, spark_kinit
 
 
 
@@ -86,8 +88,26 @@ class JobHistoryServer(Script):
     env.set_params(status_params)
 
     check_process_status(status_params.spark_history_server_pid_file)
+    if status_params.spark_history_proxy_enabled:
+      check_process_status(status_params.spark_history_proxy_pid_file)
     
 
+  def archive_event_logs(self, env):
+    import params
+    env.set_params(params)
+
+    spark_environment = {'JAVA_HOME': params.java_home, 'HADOOP_CONF_DIR': params.hadoop_conf_dir}
+    if params.security_enabled:
+      spark_environment['KRB5CCNAME'] = spark_kinit('jobhistoryserver')
+
+    Execute(format("{spark_event_log_archiver} archive --log-dir {spark_history_dir} --archive-dir {spark_history_archive_dir} "
+                   "--max-age-days {spark_history_archive_max_age} --archive-size-mb {spark_history_archive_size}"),
+            user=params.spark_user,
+            path=[params.hadoop_bin_dir],
+            environment=spark_environment,
+            logoutput=True
+    )
+
   def pre_upgrade_restart(self, env, upgrade_type=None):
     import params
 
@@ -107,7 +127,7 @@ class JobHistoryServer(Script):
 
   def get_pid_files(self):
     import status_params
-    return [status_params.spark_history_server_pid_file]
+    return [status_params.spark_history_server_pid_file, status_params.spark_history_proxy_pid_file]
 
 if __name__ == "__main__":
   JobHistoryServer().execute()
@@ -18,8 +18,11 @@ limitations under the License.
 
 """
 
+import os
 import socket
+import sys
 import status_params
+from yarn_queue import get_queue_max_executors
 from urlparse import urlparse
 
 from ambari_commons.constants import AMBARI_SUDO_BINARY
@@ -32,6 +35,7 @@ from resource_management.libraries.functions.copy_tarball import get_sysprep_ski
 from resource_management.libraries.functions.format import format
 from resource_management.libraries.functions.default import default
 from resource_management.libraries.functions import get_kinit_path
+from resource_management.libraries.functions import get_klist_path
 from resource_management.libraries.functions.get_not_managed_resources import get_not_managed_resources
 from resource_management.libraries.resources.hdfs_resource import HdfsResource
 from resource_management.libraries.script.script import Script
@@ -104,6 +108,11 @@ user_group = status_params.user_group
 spark_hdfs_user_dir = format("/user/{spark_user}")
 spark_history_dir = default('/configurations/spark3-defaults/spark.history.fs.logDirectory', "hdfs:///spark3-history")
 
+spark_history_archive_dir = default('/configurations/spark3-env/spark_history_archive_dir', "hdfs:///spark3-history-archive/")
+spark_history_archive_max_age = default('/configurations/spark3-env/spark_history_archive_max_age', 14)
+spark_history_archive_size = default('/configurations/spark3-env/spark_history_archive_size', 1024)
+spark_event_log_archiver = "{0} {1}".format(sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "event_log_archiver.py"))
+
 spark3_lib_dir = "/var/lib/spark3"
 spark_history_store_path = default("/configurations/spark3-defaults/spark.history.store.path", "/var/lib/spark3/shs_db")
 
@@ -112,6 +121,7 @@ whs_dir_protocol = urlparse(spark_warehouse_dir).scheme
 default_metastore_catalog = config['configurations']['spark3-hive-site-override']["metastore.catalog.default"]
 
 spark_history_server_pid_file = status_params.spark_history_server_pid_file
+spark_history_proxy_pid_file = status_params.spark_history_proxy_pid_file
 spark_thrift_server_pid_file = status_params.spark_thrift_server_pid_file
 
 spark_history_server_start = format("{spark_home}/sbin/start-history-server.sh")
@@ -154,15 +164,35 @@ is_hive_installed = not len(hive_server_host) == 0
 
 security_enabled = config['configurations']['cluster-env']['security_enabled']
 kinit_path_local = get_kinit_path(default('/configurations/kerberos-env/executable_search_paths', None))
+klist_path_local = get_klist_path(default('/configurations/kerberos-env/executable_search_paths', None))
 spark_kerberos_keytab =  config['configurations']['spark3-defaults']['spark.history.kerberos.keytab']
 spark_kerberos_principal =  config['configurations']['spark3-defaults']['spark.history.kerberos.principal']
 smoke_user = config['configurations']['cluster-env']['smokeuser']
 smoke_user_keytab = config['configurations']['cluster-env']['smokeuser_keytab']
 smokeuser_principal =  config['configurations']['cluster-env']['smokeuser_principal_name']
 
+# only ask for hbase delegation tokens when there is an hbase to talk to
+hbase_master_hosts = default("/clusterHostInfo/hbase_master_hosts", [])
+spark_hbase_credentials_enabled = str(len(hbase_master_hosts) > 0).lower()
+
 spark_thriftserver_hosts = default("/clusterHostInfo/spark3_thriftserver_hosts", [])
 has_spark_thriftserver = not len(spark_thriftserver_hosts) == 0
 
+# caching proxy in front of all history servers
+spark_history_proxy_enabled = status_params.spark_history_proxy_enabled
+spark_history_proxy_port = default('/configurations/spark3-env/spark_history_proxy_port', 18083)
+spark_history_proxy_cache_ttl = default('/configurations/spark3-env/spark_history_proxy_cache_ttl', 60)
+spark_history_proxy_backends = " ".join("--backend {0}://{1}:{2}".format(spark_history_scheme, host, spark_history_ui_port)
+                                        for host in sorted(spark_jobhistoryserver_hosts or [fqdn]))
+spark_history_proxy_local_backend = format("{spark_history_scheme}://{fqdn}:{spark_history_ui_port}")
+spark_history_proxy = "{0} {1}".format(sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "history_server_proxy.py"))
+spark_history_proxy_log = format("{spark_log_dir}/spark-{spark_user}-history-server-proxy.log")
+
+if spark_history_proxy_enabled:
+  spark_history_address_port = spark_history_proxy_port
+else:
+  spark_history_address_port = spark_history_ui_port
+
 # hive-site params
 spark_hive_properties = {
   'hive.metastore.uris': default('/configurations/hive-site/hive.metastore.uris', '')
@@ -199,6 +229,21 @@ if spark_transport_mode.lower() == 'binary':
 elif spark_transport_mode.lower() == 'http':
   spark_thrift_port = int(config['configurations']['spark3-hive-site-override']['hive.server2.thrift.http.port'])
 
+# dynamic allocation, the upper bound follows the maximum capacity of spark.yarn.queue
+nodemanager_hosts = default("/clusterHostInfo/nodemanager_hosts", [])
+spark_dynamic_allocation_max_executors = get_queue_max_executors(
+  default("/configurations/capacity-scheduler", {}),
+  default("/configurations/spark3-defaults/spark.yarn.queue", "default"),
+  len(nodemanager_hosts),
+  default("/configurations/yarn-site/yarn.nodemanager.resource.memory-mb", 0),
+  default("/configurations/yarn-site/yarn.nodemanager.resource.cpu-vcores", 0),
+  default("/configurations/spark3-defaults/spark.executor.memory", "1G"),
+  default("/configurations/spark3-defaults/spark.executor.cores", 1),
+  executor_memory_overhead=default("/configurations/spark3-defaults/spark.executor.memoryOverhead", None),
+  min_allocation_mb=default("/configurations/yarn-site/yarn.scheduler.minimum-allocation-mb", 1),
+  default=10
+)
+
 # thrift server support - available on HDP 2.3 or higher
 spark_thrift_sparkconf = None
 spark_thrift_cmd_opts_properties = ''
@@ -227,6 +272,11 @@ hdfs_site = config['configurations']['hdfs-site']
 hdfs_resource_ignore_file = "/var/lib/ambari-agent/data/.hdfs_resource_ignore"
 
 hive_schematool_bin = format('{stack_root}/3.1.0.0-78/{hive_component_directory}/bin')
+hive_lib_dir = format('{stack_root}/3.1.0.0-78/{hive_component_directory}/lib')
+
+# hive metastore client jars, resolved from the local hive client on configure
+spark_hive_metastore_version = default("/configurations/spark3-defaults/spark.sql.hive.metastore.version", "3.0")
+spark_hive_metastore_jars_dir = format("{spark3_lib_dir}/hive-metastore-jars/{spark_hive_metastore_version}")
 hive_metastore_db_type = config['configurations']['hive-env']['hive_database_type']
 
 ats_host = set(default("/clusterHostInfo/app_timeline_server_hosts", []))
@@ -39,6 +39,7 @@ from resource_management.libraries.functions.default import default
 from resource_management.libraries.functions.format import format
 from resource_management.libraries.functions import lzo_utils
 from resource_management.libraries.resources.xml_config import XmlConfig
+from hive_metastore import STACK_DEFAULT_METASTORE_JARS, setup_hive_metastore_jars
 
 def setup_spark(env, type, upgrade_type = None, action = None):
   import params
@@ -89,10 +90,21 @@ def setup_spark(env, type, upgrade_type = None, action = None):
 
   spark3_defaults = dict(params.config['configurations']['spark3-defaults'])
 
+  configured_metastore_jars = spark3_defaults.get('spark.sql.hive.metastore.jars')
+  if configured_metastore_jars not in STACK_DEFAULT_METASTORE_JARS:
+    Logger.info(format("Keeping spark.sql.hive.metastore.jars={configured_metastore_jars} set by the operator"))
+  elif params.is_hive_installed:
+    metastore_jars = setup_hive_metastore_jars()
+    if metastore_jars:
+      spark3_defaults['spark.sql.hive.metastore.jars'] = 'path'
+      spark3_defaults['spark.sql.hive.metastore.jars.path'] = ",".join("file://" + jar for jar in metastore_jars)
+
   if params.security_enabled:
     spark3_defaults.pop("history.server.spnego.kerberos.principal")
     spark3_defaults.pop("history.server.spnego.keytab.file")
     spark3_defaults['spark.history.kerberos.principal'] = spark3_defaults['spark.history.kerberos.principal'].replace('_HOST', socket.getfqdn().lower())
+    # let the history server log in from its keytab and re-login on its own
+    spark3_defaults['spark.history.kerberos.enabled'] = 'true'
 
   PropertiesFile(format("{spark_conf}/spark-defaults.conf"),
     properties = spark3_defaults,
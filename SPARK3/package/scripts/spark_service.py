@@ -33,12 +33,19 @@ from resource_management.libraries.functions.stack_features import check_stack_f
 from resource_management.libraries.functions.check_process_status import check_process_status
 from resource_management.libraries.functions.constants import StackFeature
 from resource_management.libraries.functions.show_logs import show_logs
+from resource_management.core import shell
 from resource_management.core.shell import as_sudo
 from resource_management.core.exceptions import ComponentIsNotRunning
 from resource_management.core.logger import Logger
 
 CHECK_COMMAND_TIMEOUT_DEFAULT = 60.0
 
+# a reused ticket must outlive the longest command run with it, ARCHIVE_EVENT_LOGS with its 3600 s timeout
+KINIT_MIN_TICKET_LIFETIME = 3600
+
+# MIT klist in the C locale, with four or two digit years depending on the version
+KLIST_TIME_FORMATS = ("%m/%d/%Y %H:%M:%S", "%m/%d/%y %H:%M:%S")
+
 def make_tarfile(output_filename, source_dir):
   try:
     os.remove(output_filename)
@@ -54,6 +61,45 @@ def make_tarfile(output_filename, source_dir):
   os.chmod(output_filename, 0644)
 
 
+def get_ticket_lifetime(ccache):
+  """
+  Returns the seconds the ticket granting ticket in ccache remains valid, or 0
+  if there is none or the klist output cannot be parsed.
+  """
+  import params
+
+  code, out = shell.call(format("LC_ALL=C {klist_path_local} -c {ccache}"), user=params.spark_user)
+  if code != 0:
+    return 0
+  for line in out.splitlines():
+    # 10/19/2026 10:00:00  10/20/2026 10:00:00  krbtgt/EXAMPLE.COM@EXAMPLE.COM
+    parts = line.split()
+    if len(parts) < 5 or not parts[4].startswith("krbtgt/"):
+      continue
+    for time_format in KLIST_TIME_FORMATS:
+      try:
+        return time.mktime(time.strptime(parts[2] + " " + parts[3], time_format)) - time.time()
+      except ValueError:
+        pass
+  return 0
+
+
+def spark_kinit(name):
+  """
+  Obtains a ticket for the spark principal into the credential cache of the
+  component, unless that cache still holds a ticket valid for at least
+  KINIT_MIN_TICKET_LIFETIME seconds. Returns the cache to be exported as
+  KRB5CCNAME.
+  """
+  import params
+
+  spark_ccache = format("{spark_pid_dir}/krb5cc_{spark_user}_{name}")
+  if get_ticket_lifetime(spark_ccache) < KINIT_MIN_TICKET_LIFETIME:
+    Execute(format("{kinit_path_local} -c {spark_ccache} -kt {spark_kerberos_keytab} {spark_principal}"),
+            user=params.spark_user)
+  return spark_ccache
+
+
 def spark_service(name, upgrade_type=None, action=None):
   import params
 
@@ -75,9 +121,9 @@ def spark_service(name, upgrade_type=None, action=None):
                           )
       params.HdfsResource(None, action="execute")
 
+    spark_environment = {'JAVA_HOME': params.java_home}
     if params.security_enabled:
-      spark_kinit_cmd = format("{kinit_path_local} -kt {spark_kerberos_keytab} {spark_principal}; ")
-      Execute(spark_kinit_cmd, user=params.spark_user)
+      spark_environment['KRB5CCNAME'] = spark_kinit(name)
 
     if name == 'jobhistoryserver':
 
@@ -85,14 +131,30 @@ def spark_service(name, upgrade_type=None, action=None):
       try:
         Execute(params.spark_history_server_start,
                 user=params.spark_user,
-                environment={'JAVA_HOME': params.java_home},
+                environment=spark_environment,
                 not_if=historyserver_no_op_test)
       except:
         show_logs(params.spark_log_dir, user=params.spark_user)
         raise
 
+      if params.spark_history_proxy_enabled:
+        proxy_no_op_test = as_sudo(["test", "-f", params.spark_history_proxy_pid_file]) + " && " + as_sudo(["pgrep", "-F", params.spark_history_proxy_pid_file])
+        Execute(format("nohup {spark_history_proxy} --port {spark_history_proxy_port} {spark_history_proxy_backends} "
+                       "--local-backend {spark_history_proxy_local_backend} --cache-ttl {spark_history_proxy_cache_ttl} "
+                       ">> {spark_history_proxy_log} 2>&1 & echo $! > {spark_history_proxy_pid_file}"),
+                user=params.spark_user,
+                not_if=proxy_no_op_test)
+
   elif action == 'stop':
     if name == 'jobhistoryserver':
+      proxy_running_test = as_sudo(["test", "-f", params.spark_history_proxy_pid_file]) + " && " + as_sudo(["pgrep", "-F", params.spark_history_proxy_pid_file])
+      Execute(format("kill `cat {spark_history_proxy_pid_file}`"),
+              user=params.spark_user,
+              only_if=proxy_running_test)
+      File(params.spark_history_proxy_pid_file,
+        action="delete"
+      )
+
       try:
         Execute(format('{spark_history_server_stop}'),
                 user=params.spark_user,
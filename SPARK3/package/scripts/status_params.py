@@ -35,5 +35,11 @@ else:
 
 spark_pid_dir = config['configurations']['spark3-env']['spark_pid_dir']
 spark_history_server_pid_file = format("{spark_pid_dir}/spark-{spark_user}-org.apache.spark.deploy.history.HistoryServer-1.pid")
+spark_history_proxy_pid_file = format("{spark_pid_dir}/spark-{spark_user}-history-server-proxy.pid")
+# the caching proxy forwards plain http and no SPNEGO credentials
+security_enabled = default("/configurations/cluster-env/security_enabled", False)
+ui_ssl_enabled = default("/configurations/spark3-defaults/spark.ssl.enabled", False)
+spark_history_proxy_enabled = str(default("/configurations/spark3-env/spark_history_proxy_enabled", False)).lower() == 'true' \
+                              and not ui_ssl_enabled and not security_enabled
 spark_thrift_server_pid_file = format("{spark_pid_dir}/spark-{spark_user}-org.apache.spark.sql.hive.thriftserver.HiveThriftServer2-1.pid")
 stack_name = default("/clusterLevelParams/stack_name", None)
@@ -0,0 +1,107 @@
+#!/usr/bin/python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+"""
+
+import math
+import re
+
+MEMORY_PATTERN = re.compile(r"^\s*(?P<amount>\d+)\s*(?P<unit>[kmgt]?)b?\s*$", re.IGNORECASE)
+MEMORY_UNIT_MB = {'k': 1.0 / 1024, '': 1, 'm': 1, 'g': 1024, 't': 1024 * 1024}
+
+# spark.executor.memoryOverhead defaults to max(384m, 10% of spark.executor.memory)
+MIN_MEMORY_OVERHEAD_MB = 384
+MEMORY_OVERHEAD_FACTOR = 0.10
+
+
+def parse_memory_mb(value):
+  """
+  Parses a Spark memory string such as 2G or 512m into MB. Values without a
+  unit are MB, as for spark.executor.memory.
+  """
+  match = MEMORY_PATTERN.match(str(value))
+  if not match:
+    raise ValueError("Invalid memory size: {0}".format(value))
+  return int(int(match.group('amount')) * MEMORY_UNIT_MB[match.group('unit').lower()])
+
+
+def get_queue_path(capacity_scheduler, queue):
+  """
+  Returns the full path (root.a.b) of queue, which may be a leaf name or a
+  full path, or None if the capacity scheduler does not define it.
+  """
+  pending = ['root']
+  while pending:
+    path = pending.pop(0)
+    if path == queue or path.endswith('.' + queue):
+      return path
+    children = capacity_scheduler.get("yarn.scheduler.capacity.{0}.queues".format(path), '')
+    pending.extend(path + '.' + child.strip() for child in children.split(',') if child.strip())
+  return None
+
+
+def get_queue_max_capacity(capacity_scheduler, queue_path):
+  """
+  Returns the share of the cluster queue_path may grow to, i.e. the product of
+  the maximum-capacity of the queue and all of its parents.
+  """
+  share = 1.0
+  parts = queue_path.split('.')
+  for i in range(2, len(parts) + 1):
+    path = '.'.join(parts[:i])
+    maximum_capacity = float(capacity_scheduler.get("yarn.scheduler.capacity.{0}.maximum-capacity".format(path), 100))
+    # -1 means unlimited, i.e. 100% of the parent
+    if maximum_capacity < 0:
+      maximum_capacity = 100
+    share *= maximum_capacity / 100
+  return share
+
+
+def get_queue_max_executors(capacity_scheduler, queue, nodemanager_count, nodemanager_memory_mb, nodemanager_vcores,
+                            executor_memory, executor_cores, executor_memory_overhead=None,
+                            min_allocation_mb=1, default=None):
+  """
+  Returns how many executors of the given size fit into the maximum capacity
+  of queue on nodemanager_count NodeManagers, or default when the queue or the
+  cluster size is unknown or any of the values cannot be parsed, e.g. absolute
+  queue resources such as maximum-capacity=[memory=10240,vcores=10]. The
+  yarn-site and spark3-defaults values may be passed as the strings found in
+  the configuration. This runs on every params import, so it must never fail.
+  """
+  try:
+    queue_path = get_queue_path(capacity_scheduler, queue)
+    cluster_memory_mb = nodemanager_count * int(nodemanager_memory_mb)
+    cluster_vcores = nodemanager_count * int(nodemanager_vcores)
+    min_allocation_mb = int(min_allocation_mb)
+    if queue_path is None or cluster_memory_mb <= 0 or cluster_vcores <= 0:
+      return default
+
+    executor_memory_mb = parse_memory_mb(executor_memory)
+    if executor_memory_overhead:
+      overhead_mb = parse_memory_mb(executor_memory_overhead)
+    else:
+      overhead_mb = max(MIN_MEMORY_OVERHEAD_MB, int(executor_memory_mb * MEMORY_OVERHEAD_FACTOR))
+    # yarn rounds every container up to a multiple of the minimum allocation
+    container_mb = int(math.ceil(float(executor_memory_mb + overhead_mb) / min_allocation_mb)) * min_allocation_mb
+
+    share = get_queue_max_capacity(capacity_scheduler, queue_path)
+    by_memory = int(cluster_memory_mb * share) // container_mb
+    by_vcores = int(cluster_vcores * share) // int(executor_cores)
+  except (ValueError, TypeError, ZeroDivisionError, AttributeError):
+    return default
+  return max(1, min(by_memory, by_vcores))
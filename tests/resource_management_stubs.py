@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Stand-ins for the Ambari agent's resource_management package, so the stack
+scripts can be imported outside of an agent.
+"""
+
+import os
+import sys
+import types
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SPARK3", "package", "scripts")
+
+STUBBED_MODULES = [
+  "resource_management",
+  "resource_management.core",
+  "resource_management.core.exceptions",
+  "resource_management.core.logger",
+  "resource_management.core.resources",
+  "resource_management.core.resources.system",
+  "resource_management.core.shell",
+  "resource_management.libraries",
+  "resource_management.libraries.functions",
+  "resource_management.libraries.functions.check_process_status",
+  "resource_management.libraries.functions.constants",
+  "resource_management.libraries.functions.copy_tarball",
+  "resource_management.libraries.functions.format",
+  "resource_management.libraries.functions.show_logs",
+  "resource_management.libraries.functions.stack_features",
+  "resource_management.libraries.functions.version",
+  "resource_management.libraries.resources",
+  "resource_management.libraries.resources.hdfs_resource",
+  "resource_management.libraries.script",
+  "resource_management.libraries.script.script",
+]
+
+
+class Fail(Exception):
+  pass
+
+
+class StubModule(types.ModuleType):
+  """
+  Stands in for a resource_management module; every name not set explicitly
+  is a no-op.
+  """
+  def __getattr__(self, name):
+    if name.startswith("__"):
+      raise AttributeError(name)
+    return lambda *args, **kwargs: None
+
+
+def install_stubs(params):
+  """
+  Replaces resource_management and params in sys.modules and puts the stack
+  scripts on sys.path.
+  """
+  for name in STUBBED_MODULES:
+    sys.modules[name] = StubModule(name)
+  # from resource_management.core import shell looks the module up on its parent
+  for name in STUBBED_MODULES:
+    if "." in name:
+      parent, child = name.rsplit(".", 1)
+      setattr(sys.modules[parent], child, sys.modules[name])
+  sys.modules["resource_management.core.exceptions"].Fail = Fail
+  sys.modules["params"] = params
+  if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
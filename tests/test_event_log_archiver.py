@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Runs event_log_archiver against local log and archive directories.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SPARK3", "package", "scripts")
+if SCRIPTS_DIR not in sys.path:
+  sys.path.insert(0, SCRIPTS_DIR)
+
+import event_log_archiver
+
+DAY = 24 * 3600
+NOW = 1700000000
+
+
+class TruncatingLocalFileSystem(event_log_archiver.LocalFileSystem):
+  """
+  Returns at most max_read bytes of every file, like a read that ends early.
+  """
+  def __init__(self, max_read):
+    self.max_read = max_read
+
+  def open(self, path):
+    source = open(path, "rb")
+    data = source.read(self.max_read)
+    source.close()
+    return TruncatedFile(data)
+
+
+class TruncatedFile(object):
+  def __init__(self, data):
+    self.data = data
+
+  def read(self, size=-1):
+    data, self.data = self.data, b""
+    return data
+
+  def close(self):
+    pass
+
+
+class TestEventLogArchiver(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.log_dir = os.path.join(self.tmp_dir, "spark3-history")
+    self.archive_dir = os.path.join(self.tmp_dir, "spark3-history-archive")
+    self.output_dir = os.path.join(self.tmp_dir, "restored")
+    os.makedirs(self.log_dir)
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def write_log(self, relative_path, content, age_days=30):
+    path = os.path.join(self.log_dir, relative_path)
+    if not os.path.isdir(os.path.dirname(path)):
+      os.makedirs(os.path.dirname(path))
+    with open(path, "wb") as f:
+      f.write(content)
+    mtime = NOW - age_days * DAY
+    os.utime(path, (mtime, mtime))
+    return path
+
+  def read(self, path):
+    with open(path, "rb") as f:
+      return f.read()
+
+  def archive(self, now=NOW):
+    return event_log_archiver.archive(self.log_dir, self.archive_dir, 14, 1024, now=now)
+
+  def test_round_trip(self):
+    plain = b'{"Event":"SparkListenerApplicationStart"}\n' * 1000
+    lz4 = os.urandom(4096)
+    rolling = [b'{"Event":"SparkListenerJobStart"}\n' * 10, b'{"Event":"SparkListenerApplicationEnd"}\n']
+    self.write_log("application_1_0001", plain)
+    self.write_log("application_1_0002.lz4", lz4)
+    self.write_log("eventlog_v2_application_1_0003/appstatus_application_1_0003", b"")
+    self.write_log("eventlog_v2_application_1_0003/events_1_application_1_0003", rolling[0])
+    self.write_log("eventlog_v2_application_1_0003/events_2_application_1_0003", rolling[1])
+
+    self.assertEqual(3, self.archive())
+    self.assertEqual([], os.listdir(self.log_dir))
+    self.assertEqual(1, len([name for name in os.listdir(self.archive_dir)
+                             if name.endswith(event_log_archiver.ARCHIVE_SUFFIX)]))
+
+    event_log_archiver.extract(self.archive_dir, "application_1_0001", self.output_dir)
+    event_log_archiver.extract(self.archive_dir, "application_1_0002", self.output_dir)
+    event_log_archiver.extract(self.archive_dir, "application_1_0003", self.output_dir)
+    self.assertEqual(plain, self.read(os.path.join(self.output_dir, "application_1_0001")))
+    self.assertEqual(lz4, self.read(os.path.join(self.output_dir, "application_1_0002.lz4")))
+    rolling_dir = os.path.join(self.output_dir, "eventlog_v2_application_1_0003")
+    self.assertEqual(b"", self.read(os.path.join(rolling_dir, "appstatus_application_1_0003")))
+    self.assertEqual(rolling[0], self.read(os.path.join(rolling_dir, "events_1_application_1_0003")))
+    self.assertEqual(rolling[1], self.read(os.path.join(rolling_dir, "events_2_application_1_0003")))
+
+  def test_lz4_logs_are_stored_as_they_are(self):
+    self.write_log("application_1_0001.lz4", b"lz4 frame")
+    self.archive()
+
+    records = event_log_archiver.read_index(self.archive_dir, "application_1_0001")
+    self.assertEqual(1, len(records))
+    self.assertEqual(event_log_archiver.CODEC_NONE, records[0][1]["codec"])
+    self.assertEqual(len(b"lz4 frame"), records[0][1]["length"])
+
+  def test_in_progress_and_recent_logs_are_skipped(self):
+    self.write_log("application_1_0001.inprogress", b"running")
+    self.write_log("eventlog_v2_application_1_0002/events_1_application_1_0002", b"done")
+    self.write_log("eventlog_v2_application_1_0002/events_2_application_1_0002.inprogress", b"running")
+    self.write_log("application_1_0003", b"recent", age_days=1)
+
+    self.assertEqual(0, self.archive())
+    self.assertEqual(["application_1_0001.inprogress", "application_1_0003", "eventlog_v2_application_1_0002"],
+                     sorted(os.listdir(self.log_dir)))
+    self.assertEqual([], event_log_archiver.read_index(self.archive_dir))
+
+  def test_short_read_keeps_originals(self):
+    first = self.write_log("application_1_0001", b"a" * 10)
+    second = self.write_log("application_1_0002", b"b" * 100)
+
+    original_get_filesystem = event_log_archiver.get_filesystem
+    def get_filesystem(path, webhdfs_urls=None):
+      if path == self.log_dir:
+        return TruncatingLocalFileSystem(50), path
+      return original_get_filesystem(path, webhdfs_urls)
+    event_log_archiver.get_filesystem = get_filesystem
+    try:
+      self.assertRaises(IOError, self.archive)
+    finally:
+      event_log_archiver.get_filesystem = original_get_filesystem
+
+    self.assertEqual(b"a" * 10, self.read(first))
+    self.assertEqual(b"b" * 100, self.read(second))
+    self.assertEqual([], os.listdir(self.archive_dir))
+
+  def test_later_archive_wins(self):
+    self.write_log("application_1_0001", b"first run")
+    self.archive(now=NOW)
+    self.write_log("application_1_0001", b"second run")
+    self.archive(now=NOW + 60)
+
+    self.assertEqual(2, len(event_log_archiver.read_index(self.archive_dir, "application_1_0001")))
+    restored = event_log_archiver.extract(self.archive_dir, "application_1_0001", self.output_dir)
+    self.assertEqual([os.path.join(self.output_dir, "application_1_0001")], restored)
+    self.assertEqual(b"second run", self.read(restored[0]))
+
+  def test_extract_unknown_application(self):
+    self.write_log("application_1_0001", b"done")
+    self.archive()
+
+    self.assertRaises(KeyError, event_log_archiver.extract, self.archive_dir, "application_1_0002", self.output_dir)
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Runs history_server_proxy in front of a local stand-in History Server.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SPARK3", "package", "scripts")
+if SCRIPTS_DIR not in sys.path:
+  sys.path.insert(0, SCRIPTS_DIR)
+
+import history_server_proxy
+from history_server_proxy import BaseHTTPRequestHandler, HTTPConnection, HTTPServer
+
+
+class StubHistoryServerHandler(BaseHTTPRequestHandler):
+  protocol_version = "HTTP/1.1"
+  server_version = "StubHistoryServer/1.0"
+
+  def do_GET(self):
+    body = b'[{"id":"application_1_0001"}]'
+    self.send_response(200)
+    self.send_header("Content-Type", "application/json")
+    self.send_header("Connection", "close, X-Backend-Hop")
+    self.send_header("X-Backend-Hop", "1")
+    self.send_header("Content-Length", str(len(body)))
+    self.end_headers()
+    self.wfile.write(body)
+
+  def log_message(self, *args):
+    pass
+
+
+class QuietHistoryServerProxyHandler(history_server_proxy.HistoryServerProxyHandler):
+  def log_message(self, *args):
+    pass
+
+
+class TestHistoryServerProxy(unittest.TestCase):
+
+  def setUp(self):
+    self.backend = HTTPServer(("127.0.0.1", 0), StubHistoryServerHandler)
+    backend_url = "http://127.0.0.1:{0}".format(self.backend.server_address[1])
+    self.proxy = history_server_proxy.HistoryServerProxy(("127.0.0.1", 0), [backend_url], backend_url,
+                                                         history_server_proxy.ResponseCache(60, 10))
+    self.proxy.RequestHandlerClass = QuietHistoryServerProxyHandler
+    for server in (self.backend, self.proxy):
+      thread = threading.Thread(target=server.serve_forever)
+      thread.daemon = True
+      thread.start()
+
+  def tearDown(self):
+    for server in (self.proxy, self.backend):
+      server.shutdown()
+      server.server_close()
+
+  def get(self, method="GET"):
+    connection = HTTPConnection("127.0.0.1", self.proxy.server_address[1])
+    try:
+      connection.request(method, "/api/v1/applications")
+      response = connection.getresponse()
+      response.read()
+      # repeated headers come back joined with ", "
+      return dict((key.lower(), value) for key, value in response.getheaders())
+    finally:
+      connection.close()
+
+  def test_server_and_date_are_sent_once(self):
+    for method in ("GET", "GET", "HEAD"):
+      headers = self.get(method)
+      self.assertNotIn("StubHistoryServer", headers["server"])
+      self.assertEqual(1, headers["date"].count("GMT"))
+
+  def test_headers_listed_in_connection_are_dropped(self):
+    self.assertNotIn("x-backend-hop", self.get())
+
+  def test_forwarded_headers(self):
+    headers = [("Connection", "keep-alive, X-Trace"), ("X-Trace", "1"), ("Accept", "*/*"),
+               ("Keep-Alive", "timeout=5"), ("Accept-Encoding", "gzip")]
+
+    self.assertEqual([("Accept", "*/*")],
+                     history_server_proxy.get_forwarded_headers(headers, dropped=("accept-encoding",)))
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Checks how resolve_metastore_jars picks the Hive metastore client jars out of
+a Hive lib dir.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+
+from resource_management_stubs import install_stubs
+
+
+class TestResolveMetastoreJars(unittest.TestCase):
+
+  def setUp(self):
+    self.lib_dir = tempfile.mkdtemp()
+    install_stubs(types.ModuleType("params"))
+    sys.modules.pop("hive_metastore", None)
+    import hive_metastore
+    self.resolve_metastore_jars = hive_metastore.resolve_metastore_jars
+
+  def tearDown(self):
+    shutil.rmtree(self.lib_dir)
+
+  def create(self, *names):
+    for name in names:
+      open(os.path.join(self.lib_dir, name), "w").close()
+
+  def resolved_names(self):
+    return [os.path.basename(jar) for jar in self.resolve_metastore_jars(self.lib_dir)]
+
+  def test_returns_real_paths(self):
+    self.create("hive-exec-3.1.0.3.1.0.0-78.jar")
+
+    self.assertEqual([os.path.realpath(os.path.join(self.lib_dir, "hive-exec-3.1.0.3.1.0.0-78.jar"))],
+                     self.resolve_metastore_jars(self.lib_dir))
+
+  def test_symlinks_collapse_onto_their_target(self):
+    self.create("hive-exec-3.1.0.3.1.0.0-78.jar")
+    os.symlink(os.path.join(self.lib_dir, "hive-exec-3.1.0.3.1.0.0-78.jar"), os.path.join(self.lib_dir, "hive-exec.jar"))
+
+    self.assertEqual(["hive-exec-3.1.0.3.1.0.0-78.jar"], self.resolved_names())
+
+  def test_highest_version_wins(self):
+    self.create("jackson-core-2.9.10.jar", "jackson-core-2.10.0.jar", "guava-19.0.jar", "guava-28.0-jre.jar")
+
+    self.assertEqual(["guava-28.0-jre.jar", "jackson-core-2.10.0.jar"], self.resolved_names())
+
+  def test_classifier_jars_are_kept_next_to_the_main_jar(self):
+    self.create("hbase-server-2.0.2.3.1.0.0-78.jar", "hbase-server-2.0.2.3.1.0.0-78-tests.jar",
+                "hive-jdbc-3.1.0.3.1.0.0-78.jar", "hive-jdbc-3.1.0.3.1.0.0-78-standalone.jar",
+                "orc-core-1.5.1-nohive.jar", "orc-core-1.5.2-nohive.jar")
+
+    self.assertEqual(["hbase-server-2.0.2.3.1.0.0-78-tests.jar", "hbase-server-2.0.2.3.1.0.0-78.jar",
+                      "hive-jdbc-3.1.0.3.1.0.0-78-standalone.jar", "hive-jdbc-3.1.0.3.1.0.0-78.jar",
+                      "orc-core-1.5.2-nohive.jar"],
+                     self.resolved_names())
+
+  def test_artifact_names_ending_in_a_number_are_kept_apart(self):
+    self.create("log4j-1.2.17.jar", "log4j-1.2-api-2.10.0.jar", "commons-lang3-3.2.jar", "commons-lang-2.6.jar")
+
+    self.assertEqual(["commons-lang-2.6.jar", "commons-lang3-3.2.jar", "log4j-1.2-api-2.10.0.jar", "log4j-1.2.17.jar"],
+                     self.resolved_names())
+
+  def test_skips_other_files_and_dangling_links(self):
+    self.create("hive-exec-3.1.0.3.1.0.0-78.jar", "README.txt")
+    os.symlink(os.path.join(self.lib_dir, "missing-1.0.jar"), os.path.join(self.lib_dir, "missing.jar"))
+
+    self.assertEqual(["hive-exec-3.1.0.3.1.0.0-78.jar"], self.resolved_names())
+
+
+if __name__ == "__main__":
+  unittest.main()
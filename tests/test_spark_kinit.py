@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Checks that spark_kinit only contacts the KDC when the component's credential
+cache holds no ticket valid for at least KINIT_MIN_TICKET_LIFETIME seconds.
+kinit and klist are shell stubs standing in for a local MIT KDC: every kinit
+counts as one KDC round-trip and writes a cache that stays valid for
+STUB_TICKET_LIFETIME seconds.
+
+The stack scripts are Python 2, so run with a Python 2.7 interpreter:
+
+  python -m unittest discover -s tests
+"""
+
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import tempfile
+import time
+import types
+import unittest
+
+from resource_management_stubs import install_stubs
+
+KINIT_STUB = """#!/bin/sh
+# kinit -c <cache> -kt <keytab> <principal>
+echo "AS-REQ $5" >> "$STUB_KDC_LOG"
+echo $(( $(date +%s) + ${STUB_TICKET_LIFETIME:-3600} )) > "$2"
+"""
+
+KLIST_STUB = """#!/bin/sh
+# klist -c <cache>: lists the ticket like MIT klist in the C locale
+[ -f "$2" ] || { echo "klist: No credentials cache found (filename: $2)" >&2; exit 1; }
+echo "Ticket cache: FILE:$2"
+echo "Default principal: spark-cluster@EXAMPLE.COM"
+echo
+echo "Valid starting       Expires              Service principal"
+echo "$(date +'%m/%d/%Y %H:%M:%S')  $(date -d @$(cat "$2") +'%m/%d/%Y %H:%M:%S')  krbtgt/EXAMPLE.COM@EXAMPLE.COM"
+"""
+
+
+def stub_format(format_string, **kwargs):
+  # like ambari's format: caller locals first, then the params module
+  variables = dict(vars(sys.modules["params"]))
+  variables.update(sys._getframe(1).f_locals)
+  variables.update(kwargs)
+  return format_string.format(**variables)
+
+
+def stub_execute(command, not_if=None, **kwargs):
+  if not_if and subprocess.call(not_if, shell=True) == 0:
+    return
+  subprocess.check_call(command, shell=True)
+
+
+def stub_call(command, **kwargs):
+  process = subprocess.Popen(command, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+  out = process.communicate()[0]
+  return process.returncode, out.decode("utf-8")
+
+
+def install_kinit_stubs(params):
+  install_stubs(params)
+  sys.modules["resource_management.libraries.functions"].format = stub_format
+  sys.modules["resource_management.core.resources.system"].Execute = stub_execute
+  sys.modules["resource_management.core.shell"].call = stub_call
+
+
+class TestSparkKinit(unittest.TestCase):
+
+  def setUp(self):
+    self.tmp_dir = tempfile.mkdtemp()
+    self.kdc_log = os.path.join(self.tmp_dir, "kdc.log")
+    for name, content in (("kinit", KINIT_STUB), ("klist", KLIST_STUB)):
+      path = os.path.join(self.tmp_dir, name)
+      with open(path, "w") as f:
+        f.write(content)
+      os.chmod(path, stat.S_IRWXU)
+    os.environ["STUB_KDC_LOG"] = self.kdc_log
+    os.environ["STUB_TICKET_LIFETIME"] = "36000"
+
+    params = types.ModuleType("params")
+    params.kinit_path_local = os.path.join(self.tmp_dir, "kinit")
+    params.klist_path_local = os.path.join(self.tmp_dir, "klist")
+    params.spark_pid_dir = self.tmp_dir
+    params.spark_user = "spark"
+    params.spark_kerberos_keytab = "/etc/security/keytabs/spark.headless.keytab"
+    params.spark_principal = "spark-cluster@EXAMPLE.COM"
+    install_kinit_stubs(params)
+
+    sys.modules.pop("spark_service", None)
+    import spark_service
+    self.spark_kinit = spark_service.spark_kinit
+
+  def tearDown(self):
+    shutil.rmtree(self.tmp_dir)
+
+  def kdc_round_trips(self):
+    if not os.path.exists(self.kdc_log):
+      return 0
+    with open(self.kdc_log) as f:
+      return len(f.readlines())
+
+  def test_valid_cache_is_reused_across_starts(self):
+    ccache = self.spark_kinit("jobhistoryserver")
+    for _ in range(4):
+      self.assertEqual(ccache, self.spark_kinit("jobhistoryserver"))
+
+    self.assertEqual(os.path.join(self.tmp_dir, "krb5cc_spark_jobhistoryserver"), ccache)
+    self.assertEqual(1, self.kdc_round_trips())
+
+  def test_expired_cache_is_renewed(self):
+    os.environ["STUB_TICKET_LIFETIME"] = "0"
+    self.spark_kinit("jobhistoryserver")
+    time.sleep(1)
+    self.spark_kinit("jobhistoryserver")
+
+    self.assertEqual(2, self.kdc_round_trips())
+
+  def test_nearly_expired_cache_is_renewed(self):
+    # still valid, so klist -s would accept it, but not for a whole ARCHIVE_EVENT_LOGS run
+    os.environ["STUB_TICKET_LIFETIME"] = "600"
+    self.spark_kinit("jobhistoryserver")
+    self.spark_kinit("jobhistoryserver")
+
+    self.assertEqual(2, self.kdc_round_trips())
+
+  def test_components_use_separate_caches(self):
+    self.assertNotEqual(self.spark_kinit("jobhistoryserver"), self.spark_kinit("thriftserver"))
+    self.spark_kinit("jobhistoryserver")
+    self.spark_kinit("thriftserver")
+
+    self.assertEqual(2, self.kdc_round_trips())
+
+
+if __name__ == "__main__":
+  unittest.main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+
+Checks the queue capacity math behind spark.dynamicAllocation.maxExecutors.
+"""
+
+import os
+import sys
+import unittest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "SPARK3", "package", "scripts")
+if SCRIPTS_DIR not in sys.path:
+  sys.path.insert(0, SCRIPTS_DIR)
+
+from yarn_queue import get_queue_max_capacity, get_queue_max_executors, get_queue_path, parse_memory_mb
+
+CAPACITY_SCHEDULER = {
+  "yarn.scheduler.capacity.root.queues": "default,etl",
+  "yarn.scheduler.capacity.root.default.maximum-capacity": "100",
+  "yarn.scheduler.capacity.root.etl.queues": "daily, adhoc",
+  "yarn.scheduler.capacity.root.etl.maximum-capacity": "50",
+  "yarn.scheduler.capacity.root.etl.daily.maximum-capacity": "40",
+  "yarn.scheduler.capacity.root.etl.adhoc.maximum-capacity": "-1",
+}
+
+
+class TestYarnQueue(unittest.TestCase):
+
+  def max_executors(self, queue="default", nodemanager_count=10, nodemanager_memory_mb="65536",
+                    nodemanager_vcores="16", executor_memory="1G", executor_cores="1", **kwargs):
+    return get_queue_max_executors(CAPACITY_SCHEDULER, queue, nodemanager_count, nodemanager_memory_mb,
+                                   nodemanager_vcores, executor_memory, executor_cores, default=-1, **kwargs)
+
+  def test_parse_memory_mb(self):
+    self.assertEqual(2048, parse_memory_mb("2G"))
+    self.assertEqual(2048, parse_memory_mb("2gb"))
+    self.assertEqual(512, parse_memory_mb("512m"))
+    self.assertEqual(1024, parse_memory_mb(1024))
+    self.assertEqual(1024 * 1024, parse_memory_mb("1t"))
+    self.assertEqual(1, parse_memory_mb("1024k"))
+    self.assertRaises(ValueError, parse_memory_mb, "2X")
+
+  def test_get_queue_path(self):
+    self.assertEqual("root", get_queue_path(CAPACITY_SCHEDULER, "root"))
+    self.assertEqual("root.default", get_queue_path(CAPACITY_SCHEDULER, "default"))
+    self.assertEqual("root.etl.adhoc", get_queue_path(CAPACITY_SCHEDULER, "adhoc"))
+    self.assertEqual("root.etl.daily", get_queue_path(CAPACITY_SCHEDULER, "root.etl.daily"))
+    self.assertEqual(None, get_queue_path(CAPACITY_SCHEDULER, "missing"))
+    self.assertEqual(None, get_queue_path({}, "default"))
+
+  def test_max_capacity_is_the_product_of_all_parents(self):
+    self.assertAlmostEqual(1.0, get_queue_max_capacity(CAPACITY_SCHEDULER, "root"))
+    self.assertAlmostEqual(0.5, get_queue_max_capacity(CAPACITY_SCHEDULER, "root.etl"))
+    self.assertAlmostEqual(0.2, get_queue_max_capacity(CAPACITY_SCHEDULER, "root.etl.daily"))
+
+  def test_unlimited_max_capacity_is_the_parent_capacity(self):
+    self.assertAlmostEqual(0.5, get_queue_max_capacity(CAPACITY_SCHEDULER, "root.etl.adhoc"))
+
+  def test_bounded_by_memory(self):
+    # 1G executors get the 384m minimum overhead
+    self.assertEqual(10 * 65536 // 1408, self.max_executors(nodemanager_vcores="1000"))
+    self.assertEqual(int(10 * 65536 * 0.2) // (4096 + 512),
+                     self.max_executors(queue="daily", nodemanager_vcores="1000", executor_memory="4g",
+                                        executor_memory_overhead="512m"))
+
+  def test_bounded_by_vcores(self):
+    self.assertEqual(10 * 16 // 4, self.max_executors(executor_cores="4"))
+    self.assertEqual(int(10 * 16 * 0.5) // 2, self.max_executors(queue="adhoc", executor_cores=2))
+
+  def test_containers_are_rounded_up_to_the_minimum_allocation(self):
+    # 1024m + 384m overhead takes a 2048m container
+    self.assertEqual(10 * 65536 // 2048,
+                     self.max_executors(nodemanager_vcores="1000", min_allocation_mb="1024"))
+
+  def test_at_least_one_executor(self):
+    self.assertEqual(1, self.max_executors(queue="daily", nodemanager_count=1, nodemanager_memory_mb="1024"))
+
+  def test_unknown_queue_or_cluster_size_falls_back(self):
+    self.assertEqual(-1, self.max_executors(queue="missing"))
+    self.assertEqual(-1, self.max_executors(nodemanager_count=0))
+    self.assertEqual(-1, self.max_executors(nodemanager_memory_mb=0))
+    self.assertEqual(-1, self.max_executors(nodemanager_vcores=0))
+
+  def test_unparsable_values_fall_back(self):
+    self.assertEqual(-1, self.max_executors(executor_memory="lots"))
+    self.assertEqual(-1, self.max_executors(executor_memory_overhead="2X"))
+    self.assertEqual(-1, self.max_executors(executor_cores="many"))
+    self.assertEqual(-1, self.max_executors(executor_cores="0"))
+    self.assertEqual(-1, self.max_executors(nodemanager_memory_mb="64GB"))
+    self.assertEqual(-1, self.max_executors(nodemanager_vcores=None))
+    self.assertEqual(-1, self.max_executors(min_allocation_mb="1g"))
+    self.assertEqual(-1, self.max_executors(min_allocation_mb="0"))
+
+  def test_absolute_queue_resources_fall_back(self):
+    capacity_scheduler = dict(CAPACITY_SCHEDULER)
+    capacity_scheduler["yarn.scheduler.capacity.root.etl.maximum-capacity"] = "[memory=10240,vcores=10]"
+
+    self.assertEqual(-1, get_queue_max_executors(capacity_scheduler, "daily", 10, "65536", "16", "1G", "1",
+                                                 default=-1))
+
+
+if __name__ == "__main__":
+  unittest.main()